@@ -1,6 +1,11 @@
 from django.apps import AppConfig
+from django.db.backends.signals import connection_created
 
 
 class GameConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'game'
+
+    def ready(self):
+        from game.db import configure_sqlite
+        connection_created.connect(configure_sqlite, dispatch_uid="game.configure_sqlite")
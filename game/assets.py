@@ -0,0 +1,117 @@
+import gzip
+import hashlib
+from pathlib import Path
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseNotModified
+from django.template.loader import render_to_string
+from django.urls import reverse
+from django.utils.http import parse_etags
+
+STATIC_DIR = Path(__file__).resolve().parent / "static" / "game"
+
+# Client bundle served under content-hashed names by views.client_asset
+CLIENT_FILES = {
+    "pong.js": "application/javascript; charset=utf-8",
+    "styles.css": "text/css; charset=utf-8",
+}
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "no-cache"  # Always revalidate, usually answered with a 304
+
+_assets = None
+_lobby_page = None
+
+
+class Asset:
+    """An in-memory response body with its ETag and a precompressed gzip variant."""
+
+    def __init__(self, name, content, content_type):
+        self.name = name
+        self.content = content
+        self.content_type = content_type
+        self.digest = hashlib.sha256(content).hexdigest()[:12]
+        self.gzipped = gzip.compress(content, compresslevel=9, mtime=0)
+
+    @property
+    def hashed_name(self):
+        """pong.js -> pong.<digest>.js"""
+        stem, ext = self.name.rsplit(".", 1)
+        return f"{stem}.{self.digest}.{ext}"
+
+    def etag(self, gzipped=False):
+        return f'"{self.digest}-gz"' if gzipped else f'"{self.digest}"'
+
+
+def _load_assets():
+    global _assets
+    if _assets is None or settings.CLIENT_ASSETS_RELOAD:
+        _assets = {}
+        for name, content_type in CLIENT_FILES.items():
+            asset = Asset(name, (STATIC_DIR / name).read_bytes(), content_type)
+            _assets[asset.hashed_name] = asset
+    return _assets
+
+
+def get_asset(hashed_name):
+    """Returns the client file for a hashed name, or None if unknown or stale."""
+    return _load_assets().get(hashed_name)
+
+
+def asset_url(name):
+    """URL of the current content-hashed version of a client file."""
+    for asset in _load_assets().values():
+        if asset.name == name:
+            return reverse("client_asset", args=[asset.hashed_name])
+    raise KeyError(name)
+
+
+def lobby_page():
+    """The rendered lobby page; it has no per-request content, so it is rendered once."""
+    global _lobby_page
+    if _lobby_page is None or settings.CLIENT_ASSETS_RELOAD:
+        html = render_to_string("game/index.html", {
+            "styles_url": asset_url("styles.css"),
+            "script_url": asset_url("pong.js"),
+        })
+        _lobby_page = Asset("index.html", html.encode(), "text/html; charset=utf-8")
+    return _lobby_page
+
+
+def accepts_gzip(accept_encoding):
+    """True if an Accept-Encoding header allows gzip (q > 0, directly or via *)."""
+    qualities = {}
+    for part in accept_encoding.split(","):
+        coding, *params = [item.strip() for item in part.split(";")]
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if coding:
+            qualities[coding.lower()] = quality
+    return qualities.get("gzip", qualities.get("*", 0.0)) > 0
+
+
+def serve(request, asset, cache_control):
+    """Serves an Asset with conditional GET (ETag) and gzip negotiation; HEAD gets headers only."""
+    gzipped = accepts_gzip(request.headers.get("Accept-Encoding", ""))
+    etag = asset.etag(gzipped)
+
+    if_none_match = parse_etags(request.headers.get("If-None-Match", ""))
+    if "*" in if_none_match or asset.etag() in if_none_match or asset.etag(True) in if_none_match:
+        response = HttpResponseNotModified()
+    else:
+        body = asset.gzipped if gzipped else asset.content
+        response = HttpResponse(b"" if request.method == "HEAD" else body, content_type=asset.content_type)
+        response["Content-Length"] = len(body)
+        if gzipped:
+            response["Content-Encoding"] = "gzip"
+
+    response["ETag"] = etag
+    response["Cache-Control"] = cache_control
+    response["Vary"] = "Accept-Encoding"
+    return response
@@ -0,0 +1,42 @@
+import uuid
+
+from game.logic import Game
+
+# Fixed player2_id for server-side opponents, so they are easy to tell apart.
+BOT_PLAYER_ID = uuid.UUID(int=0xB07)
+
+
+def is_bot(player_id):
+    """Returns True if the player id belongs to the server-side bot."""
+    return player_id is not None and str(player_id) == str(BOT_PLAYER_ID)
+
+
+def choose_direction(game_logic: Game, player="player2"):
+    """Picks UP/DOWN/STOP by steering the paddle towards the predicted ball."""
+    game = game_logic.game
+    paddle = game.player_positions[player]
+    ball = game_logic.ball
+
+    moving_towards = ball["xVel"] > 0 if player == "player2" else ball["xVel"] < 0
+    if moving_towards:
+        target_y = game_logic.predict_ball_y(paddle["x"]) + game_logic.ball_side / 2
+    else:
+        target_y = game_logic.board_height / 2  # Drift back to the middle
+
+    offset = target_y - (paddle["y"] + game_logic.player_height / 2)
+    if offset < -game_logic.player_speed:
+        return "UP"
+    if offset > game_logic.player_speed:
+        return "DOWN"
+    return "STOP"
+
+
+def play_tick(game_logic: Game, player="player2"):
+    """Moves the bot's paddle in memory for this tick and returns the direction.
+
+    Nothing is saved here; the tick's own save persists the new position.
+    """
+    direction = choose_direction(game_logic, player)
+    if direction != "STOP":
+        game_logic.move_paddle(player, direction)
+    return direction
@@ -1,9 +1,25 @@
+import asyncio
 import json
 import uuid
+from urllib.parse import parse_qs
 from channels.generic.websocket import AsyncWebsocketConsumer
 from asgiref.sync import sync_to_async
+from channels.db import database_sync_to_async
+from django.conf import settings
 from game.models import PongGame
 from game.logic import Game
+from game import bot, lobby, replay, tournament
+
+# Live PongGame instances keyed by game_key, so both players' consumers
+# step and record the same state instead of two diverging copies.
+active_games = {}
+
+
+def prewarm_games(games):
+    """Registers freshly created games so connecting players skip the DB lookup."""
+    for game in games:
+        active_games[str(game.game_key)] = game
+
 
 class GameConsumer(AsyncWebsocketConsumer):
     async def connect(self):
@@ -11,17 +27,29 @@ class GameConsumer(AsyncWebsocketConsumer):
         self.game_key = self.scope['url_route']['kwargs']['game_key']
         self.room_group_name = f'game_{self.game_key}'
 
-        # Assign a unique player ID (UUID)
-        self.player_id = str(uuid.uuid4())
+        query = parse_qs(self.scope.get("query_string", b"").decode())
+        self.seated = False
+
+        # Spectators watch an existing game without taking a seat
+        self.spectator = "spectate" in query
+        if self.spectator:
+            await self.connect_spectator()
+            return
 
         # ✅ FIX: Properly Await Database Call
-        self.game = await sync_to_async(self._sync_get_or_create_game)()
+        self.game = await database_sync_to_async(self._sync_get_or_create_game)()
         print(f"DEBUG: self.game -> {self.game}, Status: {self.game.status}")
 
+        # Assign a unique player ID (UUID); tournament players bring their own
+        if tournament.is_bracket_game(self.game):
+            self.player_id = self.bracket_player_id(query)
+        else:
+            self.player_id = str(uuid.uuid4())
+
         # Assign the player to the game
-        success = await self.assign_player(self.player_id)
-        if not success:
-            print(f"🚨 [connect] Game {self.game.game_key} is full or finished!")
+        self.seated = self.player_id is not None and await self.assign_player(self.player_id)
+        if not self.seated:
+            print(f"🚨 [connect] Game {self.game.game_key} is full, finished or reserved!")
             await self.close()
             return
 
@@ -29,56 +57,180 @@ class GameConsumer(AsyncWebsocketConsumer):
         await self.accept()
 
         # Auto-start when both players are present
-        if self.game.player1_id and self.game.player2_id and self.game.status != "in_progress":
+        if self.ready_to_start():
+            if tournament.is_bracket_game(self.game):
+                self.start_timer = asyncio.create_task(self.start_when_scheduled())
+            else:
+                await self.start_game()
+        elif settings.BOT_ENABLED and not tournament.is_bracket_game(self.game):
+            # Hand the seat to a server-side bot if nobody joins in time
+            self.bot_timer = asyncio.create_task(self.fill_with_bot())
+
+        await lobby.broadcast(lobby.track(self.game))
+
+    def bracket_player_id(self, query):
+        """The ?player_id= a bracket player claims their seat with, normalised.
+
+        None if the id is invalid, belongs to the bot, or ?token= is not its seat token.
+        """
+        try:
+            player_id = uuid.UUID(query.get("player_id", [""])[0])
+        except ValueError:
+            return None
+        if bot.is_bot(player_id):
+            return None  # The bot's seat is never claimed by a client
+        if not tournament.check_seat_token(player_id, query.get("token", [None])[0]):
+            return None
+        return str(player_id)
+
+    async def connect_spectator(self):
+        """Joins the game's broadcast group read-only."""
+        self.game = await database_sync_to_async(self._sync_get_game)()
+        if self.game is None or self.game.status == "finished":
+            await self.close()
+            return
+
+        await self.channel_layer.group_add(self.room_group_name, self.channel_name)
+        await self.accept()
+        await lobby.broadcast(lobby.add_spectator(self.game, 1))
+        await self.send(text_data=json.dumps({"status": "game_update", "state": self.get_game_state()}))
+
+    def _sync_get_game(self):
+        """Sync method for looking up an existing game without creating or caching it."""
+        game_key = str(uuid.UUID(self.game_key))
+        if game_key in active_games:
+            return active_games[game_key]
+        # Spectators only read; players' consumers own the active_games entries
+        return PongGame.objects.filter(game_key=game_key).first()
+
+    def ready_to_start(self):
+        """Both seats are filled (and, for bracket games, both players connected)."""
+        if not (self.game.player1_id and self.game.player2_id) or self.game.status != "pending":
+            return False
+        if tournament.is_bracket_game(self.game):
+            return len(self.game.connected_players) == 2
+        return True
+
+    async def start_when_scheduled(self):
+        """Holds a bracket game until its staggered start time, then starts it."""
+        await asyncio.sleep(tournament.start_delay(self.game))
+        await self.start_game()
+        await self.broadcast_game_state()
+        await lobby.broadcast(lobby.track(self.game))
+
+    async def fill_with_bot(self):
+        """Waits BOT_FILL_DELAY seconds, then seats the bot as player2 if still empty."""
+        await asyncio.sleep(settings.BOT_FILL_DELAY)
+        if await database_sync_to_async(self._sync_fill_with_bot)():
             await self.start_game()
+            await self.broadcast_game_state()
+            await lobby.broadcast(lobby.track(self.game))
+
+    def _sync_fill_with_bot(self):
+        """Sync method to assign the bot to an open player2 slot."""
+        if self.game.status != "pending" or self.game.player2_id or not self.game.player1_id:
+            return False
+
+        self.game.player2_id = bot.BOT_PLAYER_ID
+        self.game.save(update_fields=PongGame.SEAT_FIELDS)
+        print(f"🤖 [fill_with_bot] Bot joined game {self.game.game_key}")
+        return True
 
     def _sync_get_or_create_game(self):
         """Sync method for fetching or creating a game."""
-        game, created = PongGame.objects.get_or_create(
-            game_key=uuid.UUID(self.game_key),
-            defaults={"status": "pending"}
-        )
+        game_key = str(uuid.UUID(self.game_key))
+        if game_key in active_games:
+            game = active_games[game_key]
+        else:
+            game, created = PongGame.objects.get_or_create(
+                game_key=uuid.UUID(self.game_key),
+                defaults={"status": "pending"}
+            )
+            if created:
+                game.bracket = None  # A brand-new game cannot be in a bracket
+            active_games[game_key] = game
+
+        tournament.load_schedule(game)
         return game
 
     async def assign_player(self, player_id):
         """Ensures safe database modification when assigning players."""
-        return await sync_to_async(self._sync_assign_player)(player_id)
+        return await database_sync_to_async(self._sync_assign_player)(player_id)
 
     def _sync_assign_player(self, player_id):
         """Sync method to safely assign players without async issues."""
         if self.game.status == "finished":
             return False  
 
-        if not self.game.player1_id:
+        if tournament.is_bracket_game(self.game):
+            # Bracket seats are reserved; players claim them with ?player_id=
+            seats = (str(self.game.player1_id), str(self.game.player2_id))
+            if player_id not in seats or player_id in self.game.connected_players:
+                return False
+            self.game.connected_players = self.game.connected_players + [player_id]
+        elif not self.game.player1_id:
             self.game.player1_id = player_id
         elif not self.game.player2_id:
             self.game.player2_id = player_id
         else:
             return False  
 
-        self.game.save()
+        self.game.save(update_fields=PongGame.SEAT_FIELDS)
         return True
 
     async def disconnect(self, close_code):
         """Handles player disconnection."""
-        await sync_to_async(self._sync_handle_disconnect)()
+        for timer in (getattr(self, "bot_timer", None), getattr(self, "start_timer", None)):
+            if timer:
+                timer.cancel()
+
+        if getattr(self, "game", None) is None:
+            return  # Closed before a game was found
+
+        if not (self.spectator or self.seated):
+            return  # Refused a seat; the game is not ours to change
+
+        if self.spectator:
+            await lobby.broadcast(lobby.add_spectator(self.game, -1))
+        else:
+            await database_sync_to_async(self._sync_handle_disconnect)()
+            if str(self.game.game_key) in active_games:
+                await lobby.broadcast(lobby.track(self.game))
+            else:
+                await lobby.broadcast(lobby.untrack(self.game.game_key))
 
         await self.channel_layer.group_discard(self.room_group_name, self.channel_name)
 
     def _sync_handle_disconnect(self):
         """Sync method to handle player disconnection."""
+        if tournament.is_bracket_game(self.game):
+            # Keep the reserved seats and the game; only the connection goes away
+            self.game.connected_players = [p for p in self.game.connected_players if p != self.player_id]
+            self.game.save(update_fields=PongGame.SEAT_FIELDS)
+            if self.game.status == "finished" and not self.game.connected_players:
+                tournament.forget(self.game)
+                active_games.pop(str(self.game.game_key), None)
+            return
+
         if self.player_id == self.game.player1_id:
             self.game.player1_id = None
         elif self.player_id == self.game.player2_id:
             self.game.player2_id = None
 
-        self.game.save()
+        self.game.save(update_fields=PongGame.SEAT_FIELDS)
 
-        if not self.game.player1_id and not self.game.player2_id:
+        # A bot never keeps a game alive on its own
+        humans = [p for p in (self.game.player1_id, self.game.player2_id) if p and not bot.is_bot(p)]
+        if not humans:
+            replay.stop_recording(self.game.game_key)
+            active_games.pop(str(self.game.game_key), None)
             self.game.delete()
 
     async def receive(self, text_data):
         """Handles incoming WebSocket messages."""
+        if self.spectator:
+            return  # Spectators are read-only
+
         try:
             data = json.loads(text_data)
             action = data.get("action")
@@ -101,7 +253,7 @@ class GameConsumer(AsyncWebsocketConsumer):
 
     async def update_player_movement(self, direction):
         """Updates player movement based on direction."""
-        await sync_to_async(self._sync_update_player_movement)(direction)
+        await database_sync_to_async(self._sync_update_player_movement)(direction)
 
     def _sync_update_player_movement(self, direction):
         """Sync method to update player movement safely."""
@@ -123,27 +275,55 @@ class GameConsumer(AsyncWebsocketConsumer):
             new_y = current_y  # STOP
 
         player_positions[player_key]["y"] = new_y
-        self.game.player_positions = player_positions
-        self.game.save()
+        self.game.player_positions = player_positions  # Saved by the tick that follows every move
+
+        recorder = replay.get_recorder(self.game.game_key)
+        if recorder:
+            recorder.record_move(player_key, direction)
 
     async def start_game(self):
         """Starts the game when both players are ready."""
-        await sync_to_async(self._sync_start_game)()
+        await database_sync_to_async(self._sync_start_game)()
 
     def _sync_start_game(self):
         """Sync method to start game."""
         self.game.status = "in_progress"
-        self.game.save()
+        self.game.save(update_fields=["status", "updated_at"])
+        replay.start_recording(self.game)
 
     async def calculate_ball_position(self):
         """Updates ball movement based on game logic and saves it."""
+        scores = (self.game.player1_score, self.game.player2_score)
+        next_game = await database_sync_to_async(self._sync_calculate_ball_position)()
+
+        # The lobby only cares about points and results, not every tick
+        if scores != (self.game.player1_score, self.game.player2_score):
+            await lobby.broadcast(lobby.track(self.game), next_game and lobby.track(next_game))
+
+    def _sync_calculate_ball_position(self):
+        """Sync method to step the ball; returns the next bracket game if one was created."""
+        recorder = replay.get_recorder(self.game.game_key)
         game_logic = Game(self.game)
-        game_logic.update_ball_position()
-        await sync_to_async(self._sync_save_game)()
 
-    def _sync_save_game(self):
-        """Sync method to save game state."""
-        self.game.save()
+        if bot.is_bot(self.game.player2_id) and self.game.status == "in_progress":
+            direction = bot.play_tick(game_logic)
+            if recorder and direction != "STOP":
+                recorder.record_move("player2", direction)
+
+        if recorder:
+            game_logic.rng = recorder.record_tick()
+        status = self.game.status
+        game_logic.update_ball_position()  # Saves the tick, including any bot move
+
+        # Only on the tick that ends the game, not on every message after it
+        if status != "finished" and self.game.status == "finished":
+            replay.stop_recording(self.game.game_key, (self.game.player1_score, self.game.player2_score))
+            if tournament.is_bracket_game(self.game):
+                next_game = tournament.record_result(self.game)
+                if next_game:
+                    prewarm_games([next_game])
+                    return next_game
+        return None
 
     async def broadcast_game_state(self):
         """Broadcasts updated game state to all players."""
@@ -156,18 +336,17 @@ class GameConsumer(AsyncWebsocketConsumer):
             }
         )
 
-    @sync_to_async
     def get_game_state(self):
         """Returns the current game state."""
         return {
             "players": {
                 "player1": {
-                    "player_id": self.game.player1_id or "Waiting...",
+                    "player_id": str(self.game.player1_id or "Waiting..."),
                     **self.game.player_positions.get("player1", {"x": self.game.x_margin, "y": self.game.p_y_mid}),
                     "score": self.game.player1_score
                 },
                 "player2": {
-                    "player_id": self.game.player2_id or "Waiting...",
+                    "player_id": str(self.game.player2_id or "Waiting..."),
                     **self.game.player_positions.get("player2", {"x": self.game.p2_xpos, "y": self.game.p_y_mid}),
                     "score": self.game.player2_score
                 }
@@ -187,3 +366,62 @@ class GameConsumer(AsyncWebsocketConsumer):
     async def player_disconnect(self, event):
         """Notifies clients when a player disconnects."""
         await self.send(text_data=json.dumps(event))
+
+
+class LobbyConsumer(AsyncWebsocketConsumer):
+    """Sends a snapshot of open games, then incremental lobby updates."""
+
+    async def connect(self):
+        await database_sync_to_async(lobby.load)()
+        await self.channel_layer.group_add(lobby.LOBBY_GROUP, self.channel_name)
+        await self.accept()
+        await self.send(text_data=json.dumps({"status": "lobby_snapshot", **lobby.snapshot()}))
+
+    async def disconnect(self, close_code):
+        await self.channel_layer.group_discard(lobby.LOBBY_GROUP, self.channel_name)
+
+    async def lobby_update(self, event):
+        """Forwards lobby changes to the client."""
+        await self.send(text_data=json.dumps(event))
+
+
+class ReplayConsumer(AsyncWebsocketConsumer):
+    """Streams a recorded match to a websocket at 1x or 4x speed."""
+
+    async def connect(self):
+        game_key = self.scope['url_route']['kwargs']['game_key']
+        query = parse_qs(self.scope.get("query_string", b"").decode())
+        speed = query.get("speed", ["1"])[0]
+        self.speed = 4 if speed == "4" else 1
+
+        try:
+            path = replay.replay_path(uuid.UUID(game_key))
+        except ValueError:
+            await self.close()  # The route accepts any 36 hex digits/dashes
+            return
+        if not path.exists():
+            await self.close()
+            return
+
+        try:
+            self.replay_player = await sync_to_async(replay.ReplayPlayer)(path)
+        except ValueError:
+            await self.close()  # Not a recording, or the match is still being recorded
+            return
+        await self.accept()
+        self.playback = asyncio.create_task(self.play())
+
+    async def play(self):
+        """Sends one game_update per recorded tick, paced by the recorded timing."""
+        for delay_ms, game in self.replay_player.frames():
+            await asyncio.sleep(delay_ms / 1000 / self.speed)
+            await self.send(text_data=json.dumps({
+                "status": "game_update",
+                "state": Game(game).get_game_state(),
+            }, default=str))
+        await self.close()
+
+    async def disconnect(self, close_code):
+        playback = getattr(self, "playback", None)
+        if playback and playback is not asyncio.current_task():
+            playback.cancel()
@@ -0,0 +1,10 @@
+from django.conf import settings
+
+
+def configure_sqlite(sender, connection, **kwargs):
+    """Applies SQLITE_PRAGMAS (WAL, relaxed fsync, ...) to every new SQLite connection."""
+    if connection.vendor != "sqlite":
+        return
+    with connection.cursor() as cursor:
+        for pragma, value in settings.SQLITE_PRAGMAS.items():
+            cursor.execute(f"PRAGMA {pragma} = {value}")
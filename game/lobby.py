@@ -0,0 +1,106 @@
+from channels.layers import get_channel_layer
+
+from game import bot
+from game.models import PongGame
+
+LOBBY_GROUP = "lobby"
+
+# Open games (pending / in progress) keyed by game_key, kept up to date by
+# the consumers on every status or seat change instead of re-querying PongGame.
+_games = {}
+_spectators = {}
+_counts = {"pending": 0, "in_progress": 0, "players": 0, "spectators": 0}
+_loaded = False
+
+
+def _entry(game):
+    """Lobby listing for one game."""
+    key = str(game.game_key)
+    seats = [p for p in (game.player1_id, game.player2_id) if p]
+    return {
+        "game_key": key,
+        "status": game.status,
+        "players": len(seats),
+        "bot": any(bot.is_bot(p) for p in seats),
+        "spectators": _spectators.get(key, 0),
+        "score": [game.player1_score, game.player2_score],
+    }
+
+
+def _count(entry, sign):
+    """Adds (sign=1) or removes (sign=-1) an entry's share of the aggregate counts."""
+    _counts[entry["status"]] += sign
+    _counts["players"] += sign * entry["players"]
+    _counts["spectators"] += sign * entry["spectators"]
+
+
+def _replace(key, entry):
+    """Swaps a game's entry (None removes it) and returns the change, or None if unchanged."""
+    old = _games.get(key)
+    if old == entry:
+        return None
+    if old is not None:
+        _count(old, -1)
+    if entry is None:
+        _games.pop(key, None)
+        _spectators.pop(key, None)
+        return {"op": "remove", "game_key": key}
+    _games[key] = entry
+    _count(entry, 1)
+    return {"op": "upsert", "game": entry}
+
+
+def track(game):
+    """Records a game's current state; finished games leave the lobby."""
+    if game.status == "finished":
+        return untrack(game.game_key)
+    return _replace(str(game.game_key), _entry(game))
+
+
+def untrack(game_key):
+    """Removes a game from the lobby (finished or deleted)."""
+    return _replace(str(game_key), None)
+
+
+def add_spectator(game, delta):
+    """Adjusts a listed game's spectator count by delta.
+
+    Games that already left the lobby (finished or deleted) are ignored, so a
+    late spectator disconnect cannot bring them back.
+    """
+    key = str(game.game_key)
+    if key not in _games:
+        return None
+    _spectators[key] = max(0, _spectators.get(key, 0) + delta)
+    return track(game)
+
+
+def load():
+    """Seeds the index from the database once per process (sync context only)."""
+    global _loaded
+    if _loaded:
+        return
+    for game in PongGame.objects.exclude(status="finished").only(
+        "game_key", "status", "player1_id", "player2_id", "player1_score", "player2_score"
+    ):
+        if str(game.game_key) not in _games:  # Live games are already tracked
+            track(game)
+    _loaded = True
+
+
+def snapshot():
+    """All open games plus the aggregate counts."""
+    return {"games": list(_games.values()), "counts": dict(_counts)}
+
+
+async def broadcast(*changes):
+    """Pushes non-empty changes to every lobby websocket."""
+    changes = [change for change in changes if change]
+    if not changes:
+        return
+    await get_channel_layer().group_send(LOBBY_GROUP, {
+        "type": "lobby_update",
+        "status": "lobby_update",
+        "changes": changes,
+        "counts": dict(_counts),
+    })
@@ -1,28 +1,59 @@
 import math
 import random
+from functools import lru_cache
 from game.models import PongGame  # Adjusted import
 
+
+@lru_cache(maxsize=64)
+def board_geometry(board_width, board_height, player_height, ball_side):
+    """Derived paddle/ball positions for one board configuration (same formulas as PongGame)."""
+    x_margin = ball_side * 1.2
+    player_width = ball_side * 1.2
+    return {
+        "x_margin": x_margin,
+        "player_width": player_width,
+        "p2_xpos": board_width - x_margin - player_width,
+        "p_y_mid": (board_height / 2) - (player_height / 2),
+        "b_x_mid": (board_width / 2) - (ball_side / 2),
+        "b_y_mid": (board_height / 2) - (ball_side / 2),
+    }
+
+
+def warm_up():
+    """Pre-computes the geometry of the default board, e.g. while a worker boots."""
+    fields = ("board_width", "board_height", "player_height", "ball_side")
+    return board_geometry(*(PongGame._meta.get_field(field).default for field in fields))
+
+
 class Game:
-    def __init__(self, game_instance: PongGame):
-        """Initialize the game using an existing PongGame instance."""
+    def __init__(self, game_instance: PongGame, rng=None):
+        """Initialize the game using an existing PongGame instance.
+
+        ``rng`` is the random source used for ball serves; replays pass a
+        seeded ``random.Random`` so a match can be re-simulated exactly.
+        """
         self.game = game_instance
+        self.rng = rng or random
 
         # Load stored game attributes
         self.board_width = game_instance.board_width
         self.board_height = game_instance.board_height
         self.player_height = game_instance.player_height
-        self.player_width = game_instance.player_width
         self.player_speed = game_instance.player_speed
         self.ball_side = game_instance.ball_side
         self.start_speed = game_instance.start_speed
         self.speed_up_multiple = game_instance.speed_up_multiple
         self.max_speed = game_instance.max_speed
         self.points_to_win = game_instance.points_to_win
-        self.x_margin = game_instance.x_margin
-        self.p2_xpos = game_instance.p2_xpos
-        self.p_y_mid = game_instance.p_y_mid
-        self.b_x_mid = game_instance.b_x_mid
-        self.b_y_mid = game_instance.b_y_mid
+
+        # Derived positions are cached per board configuration
+        geometry = board_geometry(self.board_width, self.board_height, self.player_height, self.ball_side)
+        self.x_margin = geometry["x_margin"]
+        self.player_width = geometry["player_width"]
+        self.p2_xpos = geometry["p2_xpos"]
+        self.p_y_mid = geometry["p_y_mid"]
+        self.b_x_mid = geometry["b_x_mid"]
+        self.b_y_mid = geometry["b_y_mid"]
 
         # Ensure player positions exist
         self.game.player_positions.setdefault("player1", {"x": self.x_margin, "y": self.p_y_mid})
@@ -38,10 +69,10 @@ class Game:
 
     def _reset_ball(self, scored):
         """Reset the ball to the center of the board with a random initial velocity."""
-        angle = math.radians(random.uniform(-45, 45))
-        direction = 1 if scored == 1 else -1 if scored == 2 else random.choice([-1, 1])
+        angle = math.radians(self.rng.uniform(-45, 45))
+        direction = 1 if scored == 1 else -1 if scored == 2 else self.rng.choice([-1, 1])
 
-        # Store the ball state and persist to database
+        # Store the ball state; the tick's own save persists it
         self.ball = {
             "x": self.b_x_mid,
             "y": self.b_y_mid,
@@ -49,13 +80,18 @@ class Game:
             "yVel": self.start_speed * math.sin(angle),
             "speed": self.start_speed
         }
-        self.game.update_ball_position(self.ball)
+        self.game.update_ball_position(self.ball, save=False)
 
     def update_player_movement(self, player, direction):
         """Updates player movement & persists it in the database."""
         if self.game.status == "finished":
             return
 
+        self.move_paddle(player, direction)
+        self.game.save(update_fields=self.game.PADDLE_FIELDS)
+
+    def move_paddle(self, player, direction):
+        """Moves a paddle one step in memory; the caller decides when to save."""
         current_y = self.game.player_positions[player]["y"]
 
         # Update position based on direction
@@ -68,10 +104,22 @@ class Game:
 
         # Preserve X-position
         current_x = self.game.player_positions[player].get("x", self.x_margin if player == "player1" else self.p2_xpos)
+        self.game.player_positions[player] = {"x": current_x, "y": new_y}
+
+    def predict_ball_y(self, target_x):
+        """Predicts the ball's y when it reaches target_x, folding in wall bounces."""
+        ball = self.ball
+        if ball["xVel"] == 0:
+            return ball["y"]
+
+        ticks = (target_x - ball["x"]) / ball["xVel"]
+        if ticks < 0:
+            return ball["y"]  # Moving away from target_x
 
-        # Save new position
-        self.game.update_position(player, {"x": current_x, "y": new_y})
-        self.game.save()
+        # Reflect the unbounded trajectory back into [0, span]
+        span = self.board_height - self.ball_side
+        y = (ball["y"] + ball["yVel"] * ticks) % (2 * span)
+        return 2 * span - y if y > span else y
 
     def update_ball_position(self):
         """Updates the ball's position, handles collisions, and persists it."""
@@ -100,8 +148,9 @@ class Game:
             self._check_game_over()
             self._reset_ball(1)
 
-        self.game.update_ball_position(self.ball)
-        self.game.save()
+        # One write per tick for ball, paddles, scores and status
+        self.game.update_ball_position(self.ball, save=False)
+        self.game.save(update_fields=self.game.TICK_FIELDS)
 
     def _handle_paddle_hit(self, player):
         """Handles ball collision with paddles, calculating rebound angles."""
@@ -138,7 +187,7 @@ class Game:
             ball["xVel"] = abs(ball["xVel"]) if player == "player1" else -abs(ball["xVel"])
 
     def _check_game_over(self):
-        """Check if a player has won the game and persist scores."""
+        """Check if a player has won the game; the tick's save persists the result."""
         if self.game.player1_score >= self.points_to_win:
             self.game.winner = self.game.player1_id  # Store UUID instead of user
         elif self.game.player2_score >= self.points_to_win:
@@ -146,7 +195,6 @@ class Game:
 
         if self.game.winner:
             self.game.status = "finished"
-            self.game.save()
 
     def get_game_state(self):
         """Return the current game state as a dictionary."""
@@ -0,0 +1,39 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from game.replay import ReplayPlayer
+
+
+class Command(BaseCommand):
+    help = "Re-simulates recorded matches at full speed and checks the final scores."
+
+    def add_arguments(self, parser):
+        parser.add_argument("recordings", nargs="+", help="Paths to .pongrec files")
+
+    def handle(self, *args, **options):
+        mismatches = 0
+        for path in options["recordings"]:
+            try:
+                player = ReplayPlayer(path)
+            except (OSError, ValueError) as e:
+                raise CommandError(str(e))
+
+            started = time.perf_counter()
+            game = player.simulate()
+            elapsed = time.perf_counter() - started
+
+            result = (game.player1_score, game.player2_score)
+            recorded = player.final_scores
+            line = f"{path}: {result[0]}-{result[1]} in {elapsed * 1000:.1f}ms"
+
+            if recorded is None:
+                self.stdout.write(f"{line} (no recorded result)")
+            elif tuple(recorded) == result:
+                self.stdout.write(self.style.SUCCESS(f"{line} (matches recording)"))
+            else:
+                mismatches += 1
+                self.stdout.write(self.style.ERROR(f"{line} (recorded {recorded[0]}-{recorded[1]})"))
+
+        if mismatches:
+            raise CommandError(f"{mismatches} replay(s) diverged from their recording")
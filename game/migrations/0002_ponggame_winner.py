@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-19 02:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('game', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ponggame',
+            name='winner',
+            field=models.UUIDField(blank=True, null=True),
+        ),
+    ]
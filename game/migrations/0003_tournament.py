@@ -0,0 +1,43 @@
+# Generated by Django 4.2.30 on 2026-10-19 02:52
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('game', '0002_ponggame_winner'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Tournament',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('status', models.CharField(choices=[('in_progress', 'In Progress'), ('finished', 'Finished')], default='in_progress', max_length=20)),
+                ('rounds', models.IntegerField(default=1)),
+                ('winner', models.UUIDField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='TournamentMatch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('round', models.IntegerField()),
+                ('slot', models.IntegerField()),
+                ('player1_id', models.UUIDField(blank=True, null=True)),
+                ('player2_id', models.UUIDField(blank=True, null=True)),
+                ('winner', models.UUIDField(blank=True, null=True)),
+                ('starts_at', models.DateTimeField(blank=True, null=True)),
+                ('game', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='tournament_match', to='game.ponggame')),
+                ('tournament', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='matches', to='game.tournament')),
+            ],
+            options={
+                'ordering': ['round', 'slot'],
+                'unique_together': {('tournament', 'round', 'slot')},
+            },
+        ),
+    ]
@@ -43,10 +43,17 @@ class PongGame(models.Model):
     # Scores
     player1_score = models.IntegerField(default=0)
     player2_score = models.IntegerField(default=0)
+    winner = models.UUIDField(null=True, blank=True)  # player1_id or player2_id once finished
 
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    # Column groups for save(update_fields=...), so each save writes only what it changed
+    SEAT_FIELDS = ["player1_id", "player2_id", "connected_players", "updated_at"]
+    PADDLE_FIELDS = ["player_positions", "updated_at"]
+    BALL_FIELDS = ["ball_position", "updated_at"]
+    TICK_FIELDS = ["player_positions", "ball_position", "player1_score", "player2_score", "status", "winner", "updated_at"]
+
     # Computed properties for easier access
     @property
     def x_margin(self):
@@ -95,11 +102,11 @@ class PongGame(models.Model):
         else:
             return False  # Game is already full
 
-        self.save()
+        self.save(update_fields=self.SEAT_FIELDS)
         return True
 
-    def save(self, *args, **kwargs):
-        """Ensures default game state is initialized without overwriting existing values."""
+    def initialize_state(self):
+        """Fills in default paddle and ball state without overwriting existing values."""
         if not self.player_positions:
             self.player_positions = {
                 "player1": {"x": self.x_margin, "y": self.p_y_mid},
@@ -107,9 +114,13 @@ class PongGame(models.Model):
             }
         if not self.ball_position:
             self.ball_position = self.initialize_ball()
+
+    def save(self, *args, **kwargs):
+        """Ensures default game state is initialized without overwriting existing values."""
+        self.initialize_state()
         super().save(*args, **kwargs)
 
-    def update_position(self, player, position):
+    def update_position(self, player, position, save=True):
         """Updates a player's paddle position."""
         if player not in ["player1", "player2"]:
             return
@@ -117,9 +128,10 @@ class PongGame(models.Model):
         updated_positions[player]["y"] = position["y"]
         updated_positions[player]["x"] = position.get("x", updated_positions[player]["x"])
         self.player_positions = updated_positions
-        self.save()
+        if save:
+            self.save(update_fields=self.PADDLE_FIELDS)
 
-    def update_ball_position(self, position):
+    def update_ball_position(self, position, save=True):
         """Updates the ball's position and velocity."""
         updated_ball = self.ball_position.copy()
         updated_ball["x"] = position.get("x", updated_ball["x"])
@@ -127,7 +139,51 @@ class PongGame(models.Model):
         updated_ball["xVel"] = position.get("xVel", updated_ball["xVel"])
         updated_ball["yVel"] = position.get("yVel", updated_ball["yVel"])
         self.ball_position = updated_ball
-        self.save()
+        if save:
+            self.save(update_fields=self.BALL_FIELDS)
 
     def __str__(self):
         return f"Pong Game {self.id} (Key: {self.game_key}, Status: {self.status})"
+
+
+class Tournament(models.Model):
+    """A single-elimination bracket of PongGame matches."""
+
+    name = models.CharField(max_length=100)
+    status = models.CharField(
+        max_length=20,
+        choices=[
+            ('in_progress', 'In Progress'),
+            ('finished', 'Finished')
+        ],
+        default='in_progress'
+    )
+    rounds = models.IntegerField(default=1)  # The final is played in the last round
+    winner = models.UUIDField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"Tournament {self.id} ({self.name}, Status: {self.status})"
+
+
+class TournamentMatch(models.Model):
+    """One bracket slot; slot N of round R feeds slot N // 2 of round R + 1."""
+
+    tournament = models.ForeignKey(Tournament, on_delete=models.CASCADE, related_name="matches")
+    round = models.IntegerField()
+    slot = models.IntegerField()
+    game = models.OneToOneField(
+        PongGame, null=True, blank=True, on_delete=models.SET_NULL, related_name="tournament_match"
+    )  # No game for byes
+
+    player1_id = models.UUIDField(null=True, blank=True)
+    player2_id = models.UUIDField(null=True, blank=True)
+    winner = models.UUIDField(null=True, blank=True)
+    starts_at = models.DateTimeField(null=True, blank=True)  # Staggered start time
+
+    class Meta:
+        unique_together = [("tournament", "round", "slot")]
+        ordering = ["round", "slot"]
+
+    def __str__(self):
+        return f"Tournament {self.tournament_id} round {self.round} slot {self.slot}"
@@ -0,0 +1,202 @@
+import random
+import struct
+import time
+from pathlib import Path
+
+from django.conf import settings
+
+from game.logic import Game
+from game.models import PongGame
+
+# File layout: a fixed header (config + state at the moment recording
+# started) followed by an append-only stream of small tagged records.
+MAGIC = b"PONG"
+VERSION = 1
+
+HEADER = struct.Struct("<4sB")
+CONFIG = struct.Struct("<iiiiiddii")
+INITIAL_STATE = struct.Struct("<7d")
+
+MOVE = 1
+TICK = 2
+END = 3
+
+RECORDS = {
+    MOVE: struct.Struct("<BBH"),   # player (1/2), direction, ms since previous record
+    TICK: struct.Struct("<IH"),    # rng seed for this tick, ms since previous record
+    END: struct.Struct("<HH"),     # final scores
+}
+
+DIRECTIONS = {"STOP": 0, "UP": 1, "DOWN": 2}
+DIRECTION_NAMES = {code: name for name, code in DIRECTIONS.items()}
+
+CONFIG_FIELDS = [
+    "board_width", "board_height", "player_height", "player_speed", "ball_side",
+    "start_speed", "speed_up_multiple", "max_speed", "points_to_win",
+]
+
+# One open recorder per game key, shared by both players' consumers.
+_recorders = {}
+
+
+def replay_path(game_key):
+    """Returns the recording file for a game."""
+    return Path(settings.REPLAY_DIR) / f"{game_key}.pongrec"
+
+
+class ReplayRecorder:
+    """Appends per-tick inputs and seeds for one match to a buffered file."""
+
+    def __init__(self, game: PongGame):
+        self.game_key = str(game.game_key)
+        path = replay_path(self.game_key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        is_new = not path.exists() or path.stat().st_size == 0
+
+        # Writes land in the userspace buffer; the OS only sees them in
+        # REPLAY_BUFFER_SIZE chunks, so recording adds no syscalls per tick.
+        self.file = open(path, "ab", buffering=settings.REPLAY_BUFFER_SIZE)
+        self.last_record = time.monotonic()
+        self.seeds = random.Random()
+
+        if is_new:
+            self._write_header(game)
+
+    def _write_header(self, game):
+        """Writes the match configuration and starting state."""
+        ball = game.ball_position
+        positions = game.player_positions
+        self.file.write(HEADER.pack(MAGIC, VERSION))
+        self.file.write(CONFIG.pack(*(getattr(game, field) for field in CONFIG_FIELDS)))
+        self.file.write(INITIAL_STATE.pack(
+            ball["x"], ball["y"], ball["xVel"], ball["yVel"],
+            ball.get("speed", game.start_speed),
+            positions["player1"]["y"], positions["player2"]["y"],
+        ))
+
+    def _elapsed_ms(self):
+        """Milliseconds since the previous record, capped to fit a uint16."""
+        now = time.monotonic()
+        elapsed = min(int((now - self.last_record) * 1000), 0xFFFF)
+        self.last_record = now
+        return elapsed
+
+    def _write(self, kind, *values):
+        self.file.write(bytes([kind]) + RECORDS[kind].pack(*values))
+
+    def record_move(self, player_key, direction):
+        """Records a paddle input for player1 or player2."""
+        player = 1 if player_key == "player1" else 2
+        self._write(MOVE, player, DIRECTIONS.get(direction, 0), self._elapsed_ms())
+
+    def record_tick(self):
+        """Records a ball step and returns the seeded RNG it must use."""
+        seed = self.seeds.getrandbits(32)
+        self._write(TICK, seed, self._elapsed_ms())
+        return random.Random(seed)
+
+    def record_end(self, player1_score, player2_score):
+        """Records the final score."""
+        self._write(END, player1_score, player2_score)
+
+    def close(self):
+        self.file.close()
+
+
+def start_recording(game: PongGame):
+    """Opens (or reuses) the recorder for a game that is starting."""
+    if not settings.REPLAY_ENABLED:
+        return None
+    key = str(game.game_key)
+    if key not in _recorders:
+        _recorders[key] = ReplayRecorder(game)
+    return _recorders[key]
+
+
+def get_recorder(game_key):
+    """Returns the active recorder for a game, if it is being recorded."""
+    return _recorders.get(str(game_key))
+
+
+def stop_recording(game_key, final_scores=None):
+    """Flushes and closes a game's recording, optionally marking the result."""
+    recorder = _recorders.pop(str(game_key), None)
+    if recorder is None:
+        return
+    if final_scores is not None:
+        recorder.record_end(*final_scores)
+    recorder.close()
+
+
+class ReplayPlayer:
+    """Re-simulates a recorded match through ``game.logic.Game``."""
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            data = f.read()
+
+        # A live match's header may still be sitting in the write buffer
+        if len(data) < HEADER.size + CONFIG.size + INITIAL_STATE.size:
+            raise ValueError(f"Recording is empty or still being written: {path}")
+        magic, version = HEADER.unpack_from(data, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"Not a pong recording (version {VERSION}): {path}")
+        offset = HEADER.size
+
+        self.config = dict(zip(CONFIG_FIELDS, CONFIG.unpack_from(data, offset)))
+        offset += CONFIG.size
+        self.initial_state = INITIAL_STATE.unpack_from(data, offset)
+        offset += INITIAL_STATE.size
+
+        self.records = []
+        while offset < len(data):
+            kind = data[offset]
+            record = RECORDS.get(kind)
+            if record is None or offset + 1 + record.size > len(data):
+                break  # Truncated tail from a crash mid-write
+            self.records.append((kind, record.unpack_from(data, offset + 1)))
+            offset += 1 + record.size
+
+    @property
+    def final_scores(self):
+        """Scores from the END record, or None if the match never finished."""
+        for kind, values in reversed(self.records):
+            if kind == END:
+                return values
+        return None
+
+    def new_game(self):
+        """Builds an unsaved PongGame in the recorded starting state."""
+        game = PongGame(status="in_progress", **self.config)
+        # Replays never touch the database.
+        game.save = lambda *args, **kwargs: None
+
+        x, y, x_vel, y_vel, speed, p1_y, p2_y = self.initial_state
+        game.ball_position = {"x": x, "y": y, "xVel": x_vel, "yVel": y_vel, "speed": speed}
+        game.player_positions = {
+            "player1": {"x": game.x_margin, "y": p1_y},
+            "player2": {"x": game.p2_xpos, "y": p2_y},
+        }
+        return game
+
+    def frames(self):
+        """Yields ``(delay_ms, game)`` after every tick of the recording."""
+        game = self.new_game()
+        delay = 0
+        for kind, values in self.records:
+            if kind == MOVE:
+                player, direction, elapsed = values
+                delay += elapsed
+                Game(game).update_player_movement(f"player{player}", DIRECTION_NAMES.get(direction, "STOP"))
+            elif kind == TICK:
+                seed, elapsed = values
+                Game(game, rng=random.Random(seed)).update_ball_position()
+                yield delay + elapsed, game
+                delay = 0
+
+    def simulate(self):
+        """Runs the whole match at full CPU speed and returns the final game."""
+        game = self.new_game()
+        for _, game in self.frames():
+            pass
+        return game
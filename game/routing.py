@@ -1,6 +1,8 @@
 from django.urls import re_path
-from game.consumers import GameConsumer
+from game.consumers import GameConsumer, LobbyConsumer, ReplayConsumer
 
 websocket_urlpatterns = [
-    re_path(r'ws/game/(?P<game_key>[0-9a-fA-F-]{36})/$', GameConsumer.as_asgi()),  # Supports uppercase hex values
+    re_path(r'ws/lobby/$', LobbyConsumer.as_asgi()),
+    re_path(r'ws/game/(?P<game_key>[0-9a-fA-F-]{36})/$', GameConsumer.as_asgi()),  # Supports uppercase hex values; ?spectate=1 to watch
+    re_path(r'ws/replay/(?P<game_key>[0-9a-fA-F-]{36})/$', ReplayConsumer.as_asgi()),  # ?speed=1 or ?speed=4
 ]
@@ -1,3 +1,691 @@
-from django.test import TestCase
+import gzip
+import io
+import json
+import random
+import re
+import shutil
+import tempfile
+import uuid
+from datetime import timedelta
+from unittest.mock import patch
 
-# Create your tests here.
+from channels.db import database_sync_to_async
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management import CommandError, call_command
+from django.db.backends.sqlite3.base import DatabaseWrapper
+from channels.testing import WebsocketCommunicator
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from game import bot, lobby, replay, tournament
+from game.consumers import GameConsumer, active_games
+from game.logic import Game
+from game.models import PongGame, Tournament
+from pong_backend.asgi import application
+
+
+def detached_game(**kwargs):
+    """A PongGame that never touches the database."""
+    game = PongGame(game_key=uuid.uuid4(), status="in_progress",
+                    player1_id=uuid.uuid4(), player2_id=uuid.uuid4(), **kwargs)
+    game.save = lambda *args, **kwargs: None
+    game.initialize_state()
+    return game
+
+
+class ReplayTests(TestCase):
+    def setUp(self):
+        self.replay_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.replay_dir)
+        override = override_settings(REPLAY_DIR=self.replay_dir)
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def record_match(self, seed):
+        """Plays a full match with random inputs while recording it."""
+        inputs = random.Random(seed)
+        game = detached_game()
+        recorder = replay.start_recording(game)
+        for _ in range(100000):
+            if game.status == "finished":
+                break
+            if inputs.random() < 0.3:
+                player = inputs.choice(["player1", "player2"])
+                direction = inputs.choice(["UP", "DOWN", "STOP"])
+                Game(game).update_player_movement(player, direction)
+                recorder.record_move(player, direction)
+            Game(game, rng=recorder.record_tick()).update_ball_position()
+        replay.stop_recording(game.game_key, (game.player1_score, game.player2_score))
+        return game
+
+    def test_simulate_reproduces_recorded_match(self):
+        for seed in range(3):
+            live = self.record_match(seed)
+            player = replay.ReplayPlayer(replay.replay_path(live.game_key))
+            simulated = player.simulate()
+
+            self.assertEqual(live.status, "finished")
+            self.assertEqual(tuple(player.final_scores), (live.player1_score, live.player2_score))
+            self.assertEqual((simulated.player1_score, simulated.player2_score),
+                             (live.player1_score, live.player2_score))
+            self.assertEqual(simulated.ball_position, live.ball_position)
+            self.assertEqual(simulated.player_positions, live.player_positions)
+
+    def test_truncated_tail_is_ignored(self):
+        live = self.record_match(0)
+        path = replay.replay_path(live.game_key)
+        with open(path, "ab") as f:
+            f.write(bytes([replay.TICK]) + b"\x01")  # Half-written record
+        self.assertEqual(tuple(replay.ReplayPlayer(path).final_scores), (live.player1_score, live.player2_score))
+
+    def test_short_recording_is_rejected(self):
+        path = replay.replay_path(uuid.uuid4())
+        for data in (b"", replay.HEADER.pack(replay.MAGIC, replay.VERSION)):
+            path.write_bytes(data)
+            with self.assertRaises(ValueError):
+                replay.ReplayPlayer(path)
+            with self.assertRaises(CommandError):
+                call_command("replay", str(path), stdout=io.StringIO())
+
+
+class ReplayConsumerTests(TransactionTestCase):
+    async def test_invalid_game_key_closes_socket(self):
+        communicator = WebsocketCommunicator(application, "/ws/replay/------------------------------------/")
+        connected, _ = await communicator.connect()
+        self.assertFalse(connected)
+
+    async def test_recording_in_progress_closes_socket(self):
+        replay_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, replay_dir)
+        game_key = uuid.uuid4()
+        with override_settings(REPLAY_DIR=replay_dir):
+            replay.replay_path(game_key).touch()  # Header not flushed yet
+            communicator = WebsocketCommunicator(application, f"/ws/replay/{game_key}/")
+            connected, _ = await communicator.connect()
+        self.assertFalse(connected)
+
+
+@override_settings(REPLAY_ENABLED=False, BOT_FILL_DELAY=0.05)
+class JoinMatchBotTests(TransactionTestCase):
+    async def test_bot_fills_game_when_join_match_finds_no_opponent(self):
+        response = await self.async_client.get("/match/join/")
+        game_key = response.json()["game_key"]
+
+        communicator = WebsocketCommunicator(application, f"/ws/game/{game_key}/")
+        connected, _ = await communicator.connect()
+        self.assertTrue(connected)
+
+        game = await PongGame.objects.aget(game_key=game_key)
+        self.assertEqual(game.status, "pending")
+        self.assertIsNone(game.player2_id)
+
+        # The bot joins after BOT_FILL_DELAY and the game starts
+        state = json.loads(await communicator.receive_from(timeout=2))["state"]
+        self.assertEqual(state["status"], "in_progress")
+        self.assertEqual(state["players"]["player2"]["player_id"], str(bot.BOT_PLAYER_ID))
+
+        game = await PongGame.objects.aget(game_key=game_key)
+        self.assertTrue(bot.is_bot(game.player2_id))
+        await communicator.disconnect()
+
+
+@override_settings(REPLAY_ENABLED=False, BOT_FILL_DELAY=10, BOT_JOIN_MARGIN=2)
+class JoinMatchTests(TransactionTestCase):
+    async def test_second_player_is_matched_with_waiting_game(self):
+        first_key = (await self.async_client.get("/match/join/")).json()["game_key"]
+        communicator = WebsocketCommunicator(application, f"/ws/game/{first_key}/")
+        await communicator.connect()
+
+        second_key = (await self.async_client.get("/match/join/")).json()["game_key"]
+        self.assertEqual(second_key, first_key)
+        await communicator.disconnect()
+
+    def test_game_about_to_get_the_bot_is_not_handed_out(self):
+        waiting = PongGame.objects.create(player1_id=uuid.uuid4(), status="pending")
+        PongGame.objects.filter(pk=waiting.pk).update(created_at=timezone.now() - timedelta(seconds=9))
+
+        game_key = self.client.get("/match/join/").json()["game_key"]
+        self.assertNotEqual(game_key, str(waiting.game_key))
+
+        with override_settings(BOT_ENABLED=False):
+            self.assertEqual(self.client.get("/match/join/").json()["game_key"], str(waiting.game_key))
+
+
+class BotTests(TestCase):
+    def setUp(self):
+        self.logic = Game(detached_game())
+        self.span = self.logic.board_height - self.logic.ball_side
+
+    def stepped_y(self, ball, target_x):
+        """Steps the ball tick by tick with exact wall reflection; returns (y, bounces)."""
+        x, y, y_vel, bounces = ball["x"], ball["y"], ball["yVel"], 0
+        while x < target_x:
+            x += ball["xVel"]
+            y += y_vel
+            if y < 0 or y > self.span:
+                y = -y if y < 0 else 2 * self.span - y
+                y_vel, bounces = -y_vel, bounces + 1
+        return y, bounces
+
+    def test_prediction_matches_stepped_trajectory(self):
+        for y_vel, expected_bounces in ((1, 0), (4, 1), (-8, 2)):
+            ball = {"x": 100, "y": 200, "xVel": 5, "yVel": y_vel, "speed": 5}
+            self.logic.ball = ball
+            y, bounces = self.stepped_y(ball, 600)
+            self.assertEqual(bounces, expected_bounces)
+            self.assertAlmostEqual(self.logic.predict_ball_y(600), y)
+
+    def test_prediction_when_ball_moves_away(self):
+        self.logic.ball = {"x": 300, "y": 120, "xVel": -5, "yVel": 3, "speed": 5}
+        self.assertEqual(self.logic.predict_ball_y(600), 120)
+
+    def steer(self, ball_y, paddle_y, x_vel=5):
+        self.logic.ball = {"x": 300, "y": ball_y, "xVel": x_vel, "yVel": 0, "speed": 5}
+        self.logic.game.player_positions["player2"]["y"] = paddle_y
+        return bot.choose_direction(self.logic)
+
+    def test_choose_direction(self):
+        # Paddle centre is paddle_y + 25, ball centre is ball_y + 5
+        self.assertEqual(self.steer(ball_y=50, paddle_y=300), "UP")
+        self.assertEqual(self.steer(ball_y=400, paddle_y=100), "DOWN")
+        self.assertEqual(self.steer(ball_y=220, paddle_y=200), "STOP")
+        # Ball moving away: drift back to the middle
+        self.assertEqual(self.steer(ball_y=50, paddle_y=self.logic.p_y_mid, x_vel=-5), "STOP")
+        self.assertEqual(self.steer(ball_y=50, paddle_y=0, x_vel=-5), "DOWN")
+
+    def test_play_tick_moves_paddle(self):
+        self.steer(ball_y=50, paddle_y=300)
+        self.assertEqual(bot.play_tick(self.logic), "UP")
+        self.assertEqual(self.logic.game.player_positions["player2"]["y"], 300 - self.logic.player_speed)
+
+
+@override_settings(REPLAY_ENABLED=False, BOT_ENABLED=False)
+class BracketSeatTests(TransactionTestCase):
+    async def test_reserved_players_are_seated_after_restart(self):
+        player_ids = [str(uuid.uuid4()), str(uuid.uuid4())]
+        _, games = await database_sync_to_async(tournament.create_tournament)("Cup", player_ids)
+        game_key = str(games[0].game_key)
+
+        # Simulate a fresh worker: nothing about the bracket is in memory
+        tournament._start_times.clear()
+        active_games.clear()
+
+        communicators = [
+            WebsocketCommunicator(
+                application, f"/ws/game/{game_key}/?player_id={player_id}&token={tournament.seat_token(player_id)}"
+            )
+            for player_id in player_ids
+        ]
+        for communicator in communicators:
+            connected, _ = await communicator.connect()
+            self.assertTrue(connected)
+
+        state = json.loads(await communicators[0].receive_from(timeout=2))["state"]
+        self.assertEqual(state["status"], "in_progress")
+        for communicator in communicators:
+            await communicator.disconnect()
+
+    async def bracket_game_key(self, player_ids):
+        _, games = await database_sync_to_async(tournament.create_tournament)("Cup", player_ids)
+        return games[0].game_key
+
+    async def connect(self, game_key, player_id, token=None):
+        token = token or tournament.seat_token(str(player_id).lower())
+        communicator = WebsocketCommunicator(application, f"/ws/game/{game_key}/?player_id={player_id}&token={token}")
+        connected, _ = await communicator.connect()
+        return communicator, connected
+
+    async def test_invalid_player_id_is_refused_without_touching_the_game(self):
+        player_ids = [str(uuid.uuid4()), str(uuid.uuid4())]
+        game_key = await self.bracket_game_key(player_ids)
+
+        _, connected = await self.connect(game_key, "notauuid")
+        self.assertFalse(connected)
+
+        # Later connects to the same live game still work
+        communicator, connected = await self.connect(game_key, player_ids[0].upper())
+        self.assertTrue(connected)
+        game = await PongGame.objects.aget(game_key=game_key)
+        self.assertEqual(game.connected_players, [player_ids[0]])
+        await communicator.disconnect()
+
+    async def test_seat_needs_the_players_token(self):
+        player_ids = [str(uuid.uuid4()), str(uuid.uuid4())]
+        game_key = await self.bracket_game_key(player_ids)
+        for token in ("x", "0" * 64, tournament.seat_token(player_ids[1])):
+            _, connected = await self.connect(game_key, player_ids[0], token=token)
+            self.assertFalse(connected)
+
+    async def test_bot_id_cannot_take_a_seat(self):
+        game_key = await self.bracket_game_key([str(uuid.uuid4()), str(uuid.uuid4())])
+        _, connected = await self.connect(game_key, bot.BOT_PLAYER_ID)
+        self.assertFalse(connected)
+
+        # Outside brackets ?player_id= is ignored, so a full bot game stays full
+        game = await PongGame.objects.acreate(player1_id=uuid.uuid4(), player2_id=bot.BOT_PLAYER_ID,
+                                              status="in_progress")
+        _, connected = await self.connect(game.game_key, bot.BOT_PLAYER_ID)
+        self.assertFalse(connected)
+        self.assertTrue(await PongGame.objects.filter(pk=game.pk).aexists())
+
+    async def test_regular_game_ignores_player_id(self):
+        player_id = uuid.uuid4()
+        game_key = uuid.uuid4()
+        communicator, connected = await self.connect(game_key, player_id)
+        self.assertTrue(connected)
+        game = await PongGame.objects.aget(game_key=game_key)
+        self.assertNotEqual(game.player1_id, player_id)
+        await communicator.disconnect()
+
+    async def test_unreserved_player_is_refused(self):
+        _, games = await database_sync_to_async(tournament.create_tournament)(
+            "Cup", [str(uuid.uuid4()), str(uuid.uuid4())]
+        )
+        active_games.clear()
+        communicator = WebsocketCommunicator(application, f"/ws/game/{games[0].game_key}/")
+        connected, _ = await communicator.connect()
+        self.assertFalse(connected)
+
+
+class GameOverTests(TransactionTestCase):
+    def finished_consumer(self):
+        """A GameConsumer whose game has just ended."""
+        game = PongGame.objects.create(player1_id=uuid.uuid4(), player2_id=uuid.uuid4(), status="finished")
+        game.bracket = None
+        consumer = GameConsumer()
+        consumer.game = game
+        return consumer
+
+    def test_messages_after_game_over_do_not_repeat_result_handling(self):
+        consumer = self.finished_consumer()
+        with patch.object(replay, "stop_recording") as stop_recording, \
+                CaptureQueriesContext(connection) as queries:
+            consumer._sync_calculate_ball_position()
+            consumer._sync_calculate_ball_position()
+
+        stop_recording.assert_not_called()
+        self.assertEqual(len(queries), 0)
+
+    def test_result_is_handled_once_on_the_final_point(self):
+        game = PongGame.objects.create(player1_id=uuid.uuid4(), player2_id=uuid.uuid4(),
+                                       status="in_progress", points_to_win=1)
+        game.bracket = None
+        game.ball_position = {"x": 1, "y": 100, "xVel": -5, "yVel": 0, "speed": 5}
+        consumer = GameConsumer()
+        consumer.game = game
+
+        with patch.object(replay, "stop_recording") as stop_recording:
+            consumer._sync_calculate_ball_position()
+            consumer._sync_calculate_ball_position()
+
+        self.assertEqual(game.status, "finished")
+        stop_recording.assert_called_once_with(game.game_key, (0, 1))
+
+
+@override_settings(TOURNAMENT_STAGGER_BATCH=2, TOURNAMENT_STAGGER_INTERVAL=1)
+class TournamentBracketTests(TestCase):
+    def players(self, count):
+        return [uuid.uuid4() for _ in range(count)]
+
+    def round_matches(self, bracket, round):
+        return list(bracket.matches.filter(round=round).order_by("slot"))
+
+    def finish(self, match, winner):
+        """Ends a match's game with the given winner and records the result."""
+        game = match.game
+        game.winner = winner
+        game.status = "finished"
+        game.save()
+        return tournament.record_result(game)
+
+    def test_three_players_get_one_bye(self):
+        a, b, c = self.players(3)
+        bracket, games = tournament.create_tournament("Cup", [a, b, c])
+
+        self.assertEqual(bracket.rounds, 2)
+        first_round = self.round_matches(bracket, 1)
+        self.assertEqual([(m.player1_id, m.player2_id) for m in first_round], [(a, None), (b, c)])
+        self.assertEqual(first_round[0].winner, a)  # Bye
+        self.assertIsNone(first_round[0].game)
+        self.assertEqual(len(games), 1)
+        self.assertEqual((games[0].player1_id, games[0].player2_id), (b, c))
+
+    def test_five_players_pair_byes_into_second_round(self):
+        a, b, c, d, e = self.players(5)
+        bracket, games = tournament.create_tournament("Cup", [a, b, c, d, e])
+
+        self.assertEqual(bracket.rounds, 3)
+        first_round = self.round_matches(bracket, 1)
+        self.assertEqual([(m.player1_id, m.player2_id) for m in first_round],
+                         [(a, None), (b, None), (c, None), (d, e)])
+        self.assertEqual([m.winner for m in first_round], [a, b, c, None])
+
+        # Slots 0 and 1 were both byes, so a vs b is ready immediately
+        second_round = self.round_matches(bracket, 2)
+        self.assertEqual([(m.slot, m.player1_id, m.player2_id) for m in second_round], [(0, a, b)])
+        self.assertEqual(len(games), 2)
+
+    def test_first_round_starts_are_staggered(self):
+        bracket, _ = tournament.create_tournament("Cup", self.players(8))
+        starts = [m.starts_at for m in self.round_matches(bracket, 1)]
+        self.assertEqual(starts[0], starts[1])
+        self.assertEqual((starts[2] - starts[0]).total_seconds(), 1)
+        self.assertEqual((starts[3] - starts[0]).total_seconds(), 1)
+
+    def test_winners_advance_to_final(self):
+        a, b, c, d = self.players(4)
+        bracket, _ = tournament.create_tournament("Cup", [a, b, c, d])
+        semi_1, semi_2 = self.round_matches(bracket, 1)  # a vs d, b vs c
+
+        self.assertIsNone(self.finish(semi_1, a))  # Waits for the other semi-final
+        final_game = self.finish(semi_2, c)
+        self.assertEqual((final_game.player1_id, final_game.player2_id), (a, c))
+        self.assertTrue(tournament.is_bracket_game(final_game))
+
+        final, = self.round_matches(bracket, 2)
+        self.finish(final, c)
+        bracket.refresh_from_db()
+        self.assertEqual(bracket.status, "finished")
+        self.assertEqual(bracket.winner, c)
+
+    def test_result_is_recorded_once(self):
+        a, b = self.players(2)
+        bracket, _ = tournament.create_tournament("Cup", [a, b])
+        final, = self.round_matches(bracket, 1)
+        self.finish(final, a)
+        self.assertIsNone(tournament.record_result(final.game))
+
+    def test_rejects_invalid_player_lists(self):
+        with self.assertRaises(ValueError):
+            tournament.create_tournament("Cup", self.players(1))
+        a = uuid.uuid4()
+        with self.assertRaises(ValueError):
+            tournament.create_tournament("Cup", [a, a])
+        with override_settings(TOURNAMENT_MAX_PLAYERS=4), self.assertRaises(ValueError):
+            tournament.create_tournament("Cup", self.players(5))
+
+
+class CreateTournamentViewTests(TestCase):
+    def post(self, player_ids):
+        return self.client.post("/tournament/create/", json.dumps({"name": "Cup", "player_ids": player_ids}),
+                                content_type="application/json")
+
+    def test_requires_staff(self):
+        self.assertEqual(self.post([str(uuid.uuid4()) for _ in range(2)]).status_code, 403)
+
+        self.client.force_login(User.objects.create_user("player"))
+        self.assertEqual(self.post([str(uuid.uuid4()) for _ in range(2)]).status_code, 403)
+        self.assertFalse(Tournament.objects.exists())
+
+    @override_settings(TOURNAMENT_MAX_PLAYERS=4)
+    def test_staff_can_create_within_cap(self):
+        self.client.force_login(User.objects.create_user("ops", is_staff=True))
+
+        self.assertEqual(self.post([str(uuid.uuid4()) for _ in range(5)]).status_code, 400)
+        self.assertFalse(PongGame.objects.exists())
+
+        player_ids = [str(uuid.uuid4()) for _ in range(4)]
+        response = self.post(player_ids)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()["matches"]), 2)
+        self.assertEqual(response.json()["seat_tokens"],
+                         {player_id: tournament.seat_token(player_id) for player_id in player_ids})
+
+    def test_public_status_has_no_seat_tokens(self):
+        bracket, _ = tournament.create_tournament("Cup", [uuid.uuid4(), uuid.uuid4()])
+        response = self.client.get(f"/tournament/{bracket.id}/")
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("seat_tokens", response.json())
+
+
+class SQLiteProfileTests(TestCase):
+    def test_configure_sqlite_enables_wal(self):
+        # The test database lives in memory, where WAL does not apply; use a file
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        wrapper = DatabaseWrapper({**connection.settings_dict, "NAME": f"{directory}/pong.sqlite3"}, alias="wal_test")
+        self.addCleanup(wrapper.close)
+
+        with wrapper.cursor() as cursor:  # Opening the connection runs configure_sqlite
+            cursor.execute("PRAGMA journal_mode")
+            self.assertEqual(cursor.fetchone()[0], "wal")
+            cursor.execute("PRAGMA synchronous")
+            self.assertEqual(cursor.fetchone()[0], 1)  # NORMAL
+            cursor.execute("PRAGMA busy_timeout")
+            self.assertEqual(cursor.fetchone()[0], settings.SQLITE_PRAGMAS["busy_timeout"])
+
+
+class UpdateFieldsTests(TestCase):
+    def setUp(self):
+        self.game = PongGame.objects.create(player1_id=uuid.uuid4(), player2_id=uuid.uuid4(), status="in_progress")
+        self.game.ball_position = {"x": 300, "y": 200, "xVel": 5, "yVel": 1, "speed": 5}
+
+    def assertSingleUpdate(self, queries, columns):
+        """Exactly one UPDATE, writing only the given columns (plus updated_at)."""
+        self.assertEqual(len(queries), 1)
+        sql = queries[0]["sql"]
+        self.assertTrue(sql.startswith('UPDATE "game_ponggame"'))
+        written = set(re.findall(r'"(\w+)" = ', sql.split(" WHERE ")[0]))
+        self.assertEqual(written, set(columns) | {"updated_at"})
+
+    def test_ball_step_is_one_update_of_tick_fields(self):
+        with CaptureQueriesContext(connection) as queries:
+            Game(self.game).update_ball_position()
+        self.assertSingleUpdate(queries, PongGame.TICK_FIELDS)
+
+    def test_scoring_tick_is_one_update(self):
+        self.game.ball_position = {"x": 1, "y": 200, "xVel": -5, "yVel": 0, "speed": 5}
+        with CaptureQueriesContext(connection) as queries:
+            Game(self.game).update_ball_position()
+        self.assertEqual(self.game.player2_score, 1)
+        self.assertSingleUpdate(queries, PongGame.TICK_FIELDS)
+
+    def test_winning_tick_is_one_update(self):
+        self.game.points_to_win = 1
+        self.game.ball_position = {"x": 1, "y": 200, "xVel": -5, "yVel": 0, "speed": 5}
+        with CaptureQueriesContext(connection) as queries:
+            Game(self.game).update_ball_position()
+        self.assertEqual(self.game.status, "finished")
+        self.assertSingleUpdate(queries, PongGame.TICK_FIELDS)
+
+        self.game.refresh_from_db()
+        self.assertEqual((self.game.status, self.game.winner), ("finished", self.game.player2_id))
+
+    def test_move_message_is_one_update(self):
+        consumer = GameConsumer()
+        consumer.game = self.game
+        consumer.player_id = self.game.player1_id
+        with CaptureQueriesContext(connection) as queries:
+            consumer._sync_update_player_movement("UP")
+            consumer._sync_calculate_ball_position()
+        self.assertSingleUpdate(queries, PongGame.TICK_FIELDS)
+
+        self.game.refresh_from_db()
+        self.assertEqual(self.game.player_positions["player1"]["y"], self.game.p_y_mid - self.game.player_speed)
+
+    def test_paddle_move_writes_only_positions(self):
+        with CaptureQueriesContext(connection) as queries:
+            Game(self.game).update_player_movement("player1", "UP")
+        self.assertSingleUpdate(queries, ["player_positions"])
+
+
+@override_settings(CLIENT_ASSETS_RELOAD=False)
+class ClientAssetTests(TestCase):
+    def asset_urls(self):
+        html = self.client.get("/pong/").content.decode()
+        return re.findall(r'(?:href|src)="(/assets/[^"]+)"', html)
+
+    def test_lobby_page_links_hashed_assets(self):
+        styles_url, script_url = self.asset_urls()
+        self.assertRegex(styles_url, r"^/assets/styles\.[0-9a-f]{12}\.css$")
+        self.assertRegex(script_url, r"^/assets/pong\.[0-9a-f]{12}\.js$")
+
+    def test_lobby_page_revalidates_with_etag(self):
+        response = self.client.get("/pong/")
+        self.assertEqual(response["Cache-Control"], "no-cache")
+        self.assertIn("Accept-Encoding", response["Vary"])
+
+        cached = self.client.get("/pong/", HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(cached.status_code, 304)
+        self.assertEqual(cached.content, b"")
+        self.assertEqual(cached["ETag"], response["ETag"])
+
+    def test_asset_is_immutable_and_conditional(self):
+        _, script_url = self.asset_urls()
+        response = self.client.get(script_url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Cache-Control"], "public, max-age=31536000, immutable")
+        self.assertIn("Accept-Encoding", response["Vary"])
+        self.assertEqual(self.client.get(script_url, HTTP_IF_NONE_MATCH=response["ETag"]).status_code, 304)
+
+    def test_gzip_negotiation(self):
+        _, script_url = self.asset_urls()
+        plain = self.client.get(script_url)
+
+        for header in ("gzip", "gzip, deflate, br", "br;q=1.0, gzip;q=0.5", "*"):
+            response = self.client.get(script_url, HTTP_ACCEPT_ENCODING=header)
+            self.assertEqual(response["Content-Encoding"], "gzip", header)
+            self.assertEqual(gzip.decompress(response.content), plain.content)
+            # A cached gzip copy still validates
+            self.assertEqual(self.client.get(script_url, HTTP_IF_NONE_MATCH=response["ETag"]).status_code, 304)
+
+        for header in ("", "gzip;q=0", "br", "*;q=0", "gzip;q=0, *"):
+            response = self.client.get(script_url, HTTP_ACCEPT_ENCODING=header)
+            self.assertFalse(response.has_header("Content-Encoding"), header)
+
+    def test_head_is_allowed(self):
+        _, script_url = self.asset_urls()
+        for url in ("/pong/", script_url):
+            response = self.client.head(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.content, b"")
+            self.assertGreater(int(response["Content-Length"]), 0)
+
+    def test_outdated_or_unknown_hash_is_404(self):
+        self.assertEqual(self.client.get("/assets/pong.000000000000.js").status_code, 404)
+        self.assertEqual(self.client.get("/assets/secret.txt").status_code, 404)
+
+
+@override_settings(REPLAY_ENABLED=False, BOT_ENABLED=False)
+class LobbySpectatorTests(TransactionTestCase):
+    async def connect(self, path):
+        communicator = WebsocketCommunicator(application, path)
+        connected, _ = await communicator.connect()
+        self.assertTrue(connected)
+        return communicator
+
+    def listed_keys(self):
+        return {entry["game_key"] for entry in lobby.snapshot()["games"]}
+
+    async def test_spectator_leaving_deleted_game_does_not_relist_it(self):
+        spectators_before = lobby.snapshot()["counts"]["spectators"]
+        game_key = str(uuid.uuid4())
+        player = await self.connect(f"/ws/game/{game_key}/")
+        spectator = await self.connect(f"/ws/game/{game_key}/?spectate=1")
+        self.assertIn(game_key, self.listed_keys())
+        self.assertEqual(lobby.snapshot()["counts"]["spectators"], spectators_before + 1)
+
+        await player.disconnect()  # Last player leaves: game deleted
+        self.assertNotIn(game_key, self.listed_keys())
+
+        await spectator.disconnect()
+        self.assertNotIn(game_key, self.listed_keys())
+        self.assertEqual(lobby.snapshot()["counts"]["spectators"], spectators_before)
+        self.assertFalse(await PongGame.objects.filter(game_key=game_key).aexists())
+
+    async def test_spectating_does_not_cache_game(self):
+        game = await PongGame.objects.acreate(player1_id=uuid.uuid4(), status="pending")
+        spectator = await self.connect(f"/ws/game/{game.game_key}/?spectate=1")
+        self.assertNotIn(str(game.game_key), active_games)
+        await spectator.disconnect()
+        self.assertNotIn(str(game.game_key), self.listed_keys())
+
+
+@override_settings(REPLAY_ENABLED=False, BOT_ENABLED=False)
+class LobbyTests(TransactionTestCase):
+    def setUp(self):
+        # Start every test from an empty, not yet loaded index
+        empty = {"_games": {}, "_spectators": {}, "_loaded": False,
+                 "_counts": {"pending": 0, "in_progress": 0, "players": 0, "spectators": 0}}
+        for name, value in empty.items():
+            patcher = patch.object(lobby, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_lobby_status_lists_open_games_with_counts(self):
+        waiting = PongGame.objects.create(player1_id=uuid.uuid4(), status="pending")
+        playing = PongGame.objects.create(player1_id=uuid.uuid4(), player2_id=bot.BOT_PLAYER_ID,
+                                          status="in_progress", player1_score=2)
+        PongGame.objects.create(player1_id=uuid.uuid4(), player2_id=uuid.uuid4(), status="finished")
+
+        response = self.client.get("/lobby/")
+        self.assertEqual(response.status_code, 200)
+        games = {game["game_key"]: game for game in response.json()["games"]}
+        self.assertEqual(set(games), {str(waiting.game_key), str(playing.game_key)})
+        self.assertEqual(games[str(playing.game_key)]["score"], [2, 0])
+        self.assertTrue(games[str(playing.game_key)]["bot"])
+        self.assertEqual(response.json()["counts"], {"pending": 1, "in_progress": 1, "players": 3, "spectators": 0})
+
+    def test_reads_after_load_run_no_queries(self):
+        PongGame.objects.create(player1_id=uuid.uuid4(), status="pending")
+        lobby.load()
+
+        with CaptureQueriesContext(connection) as queries:
+            lobby.load()
+            snapshot = lobby.snapshot()
+            response = self.client.get("/lobby/")
+        self.assertEqual(len(queries), 0)
+        self.assertEqual(response.json(), snapshot)
+
+    async def test_socket_gets_snapshot_then_incremental_updates(self):
+        await PongGame.objects.acreate(player1_id=uuid.uuid4(), status="pending")
+        feed = WebsocketCommunicator(application, "/ws/lobby/")
+        connected, _ = await feed.connect()
+        self.assertTrue(connected)
+
+        snapshot = await feed.receive_json_from()
+        self.assertEqual(snapshot["status"], "lobby_snapshot")
+        self.assertEqual(len(snapshot["games"]), 1)
+        self.assertEqual(snapshot["counts"]["pending"], 1)
+
+        async def next_change():
+            update = await feed.receive_json_from(timeout=2)
+            self.assertEqual(update["status"], "lobby_update")
+            change, = update["changes"]
+            return change, update["counts"]
+
+        # Join
+        game_key = str(uuid.uuid4())
+        player1 = WebsocketCommunicator(application, f"/ws/game/{game_key}/")
+        await player1.connect()
+        change, counts = await next_change()
+        self.assertEqual((change["op"], change["game"]["status"], change["game"]["players"]),
+                         ("upsert", "pending", 1))
+        self.assertEqual(counts["pending"], 2)
+
+        # Start
+        player2 = WebsocketCommunicator(application, f"/ws/game/{game_key}/")
+        await player2.connect()
+        change, counts = await next_change()
+        self.assertEqual((change["game"]["status"], change["game"]["players"]), ("in_progress", 2))
+        self.assertEqual((counts["pending"], counts["in_progress"], counts["players"]), (1, 1, 3))
+
+        # Score, then finish
+        game = active_games[game_key]
+        game.points_to_win = 2
+        for expected in ([0, 1], None):
+            game.ball_position = {"x": 1, "y": 200, "xVel": -5, "yVel": 0, "speed": 5}
+            await player1.send_json_to({"action": "move", "direction": "STOP"})
+            change, counts = await next_change()
+            if expected:
+                self.assertEqual((change["op"], change["game"]["score"]), ("upsert", expected))
+        self.assertEqual(change, {"op": "remove", "game_key": game_key})
+        self.assertEqual((counts["pending"], counts["in_progress"], counts["players"]), (1, 0, 1))
+
+        await player1.disconnect()
+        await player2.disconnect()
+        self.assertTrue(await feed.receive_nothing())
+        await feed.disconnect()
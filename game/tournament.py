@@ -0,0 +1,181 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from django.utils.crypto import constant_time_compare, salted_hmac
+
+from game.models import PongGame, Tournament, TournamentMatch
+
+# Cache of bracket start times by game_key, filled when this process creates
+# bracket games. The database (TournamentMatch.starts_at) is authoritative.
+_start_times = {}
+
+
+def _bracket_size(count):
+    """Smallest power of two that fits every player."""
+    size = 1
+    while size < count:
+        size *= 2
+    return size
+
+
+def _new_game(player1_id, player2_id):
+    """Builds an unsaved PongGame with both seats reserved."""
+    game = PongGame(player1_id=player1_id, player2_id=player2_id, status="pending")
+    game.initialize_state()  # bulk_create skips PongGame.save()
+    return game
+
+
+def _schedule(matches):
+    """Remembers when each bracket game is allowed to start."""
+    for match in matches:
+        if match.game is not None:
+            _start_times[str(match.game.game_key)] = match.starts_at
+            match.game.bracket = {"starts_at": match.starts_at}
+
+
+def load_schedule(game):
+    """Caches on a live game whether it is a bracket game (sync context only).
+
+    ``game.bracket`` is None for regular games, else ``{"starts_at": ...}``.
+    Looked up in the database at most once per live game object, so bracket
+    seats survive restarts and work on every worker.
+    """
+    if hasattr(game, "bracket"):
+        return
+    key = str(game.game_key)
+    if key in _start_times:
+        game.bracket = {"starts_at": _start_times[key]}
+    else:
+        game.bracket = TournamentMatch.objects.filter(game=game).values("starts_at").first()
+        if game.bracket is not None:
+            _start_times[key] = game.bracket["starts_at"]
+
+
+def seat_token(player_id):
+    """Secret a player presents with ?token= to claim their bracket seats.
+
+    Player ids are public (tournament_status lists them); the token is only
+    handed out by create_tournament.
+    """
+    return salted_hmac("game.tournament.seat", str(player_id)).hexdigest()
+
+
+def check_seat_token(player_id, token):
+    return bool(token) and constant_time_compare(seat_token(player_id), token)
+
+
+def is_bracket_game(game):
+    """Returns True if the game belongs to a tournament (see load_schedule)."""
+    return getattr(game, "bracket", None) is not None
+
+
+def forget(game):
+    """Drops a finished bracket game from the start-time cache."""
+    _start_times.pop(str(game.game_key), None)
+
+
+def start_delay(game):
+    """Seconds until a bracket game may start (0 for regular games)."""
+    starts_at = game.bracket["starts_at"] if is_bracket_game(game) else None
+    if starts_at is None:
+        return 0
+    return max(0, (starts_at - timezone.now()).total_seconds())
+
+
+def create_tournament(name, player_ids):
+    """Creates a bracket and all first-round games in one transaction.
+
+    Returns the tournament and the PongGame instances that were created, so
+    the caller can pre-warm them. First-round games start in batches of
+    TOURNAMENT_STAGGER_BATCH, TOURNAMENT_STAGGER_INTERVAL seconds apart.
+    """
+    if len(player_ids) < 2:
+        raise ValueError("A tournament needs at least two players")
+    if len(player_ids) > settings.TOURNAMENT_MAX_PLAYERS:
+        raise ValueError(f"A tournament takes at most {settings.TOURNAMENT_MAX_PLAYERS} players")
+    if len(set(player_ids)) != len(player_ids):
+        raise ValueError("Player ids must be unique")
+
+    # Pair top half against bottom half; padding with byes (None) never pairs two byes
+    seeds = list(player_ids) + [None] * (_bracket_size(len(player_ids)) - len(player_ids))
+    pairs = [(seeds[i], seeds[-1 - i]) for i in range(len(seeds) // 2)]
+
+    now = timezone.now()
+    batch = settings.TOURNAMENT_STAGGER_BATCH
+    interval = settings.TOURNAMENT_STAGGER_INTERVAL
+
+    with transaction.atomic():
+        tournament = Tournament.objects.create(name=name, rounds=len(seeds).bit_length() - 1)
+
+        matches = []
+        for slot, (player1_id, player2_id) in enumerate(pairs):
+            match = TournamentMatch(
+                tournament=tournament, round=1, slot=slot,
+                player1_id=player1_id, player2_id=player2_id,
+            )
+            if player2_id is None:
+                match.winner = player1_id  # Bye
+            else:
+                match.game = _new_game(player1_id, player2_id)
+                match.starts_at = now + timedelta(seconds=(slot // batch) * interval)
+            matches.append(match)
+
+        games = PongGame.objects.bulk_create([m.game for m in matches if m.game is not None])
+        for match in matches:
+            match.game_id = match.game.id if match.game is not None else None
+        TournamentMatch.objects.bulk_create(matches)
+
+        # Byes are already decided and may fill second-round slots
+        for match in matches:
+            if match.game is None:
+                new_game = _advance(tournament, match)
+                if new_game is not None:
+                    games.append(new_game)
+
+    _schedule(matches)
+    return tournament, games
+
+
+def record_result(game):
+    """Stores a finished game's winner and advances them in the bracket.
+
+    Returns the next-round PongGame if this result completed a pairing.
+    """
+    match = TournamentMatch.objects.select_related("tournament").filter(game=game).first()
+    if match is None or match.winner is not None or game.winner is None:
+        return None
+
+    with transaction.atomic():
+        match.winner = game.winner
+        match.save(update_fields=["winner"])
+        return _advance(match.tournament, match)
+
+
+def _advance(tournament, match):
+    """Creates the next-round match once both feeder matches have winners."""
+    if match.round == tournament.rounds:
+        tournament.winner = match.winner
+        tournament.status = "finished"
+        tournament.save(update_fields=["winner", "status"])
+        return None
+
+    sibling = TournamentMatch.objects.filter(
+        tournament=tournament, round=match.round, slot=match.slot ^ 1
+    ).first()
+    if sibling is None or sibling.winner is None:
+        return None
+    if TournamentMatch.objects.filter(tournament=tournament, round=match.round + 1, slot=match.slot // 2).exists():
+        return None  # Already advanced from the sibling's side
+
+    first, second = sorted([match, sibling], key=lambda m: m.slot)
+    game = _new_game(first.winner, second.winner)
+    game.save()
+    next_match = TournamentMatch.objects.create(
+        tournament=tournament, round=match.round + 1, slot=match.slot // 2,
+        player1_id=first.winner, player2_id=second.winner,
+        game=game, starts_at=timezone.now(),
+    )
+    _schedule([next_match])
+    return game
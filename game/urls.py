@@ -1,7 +1,11 @@
 from django.urls import path
-from game.views import pong_game, join_match 
+from game.views import pong_game, client_asset, join_match, lobby_status, create_tournament, tournament_status
 
 urlpatterns = [
     path("pong/", pong_game, name="pong_game"),
+    path("assets/<str:filename>", client_asset, name="client_asset"),  # Content-hashed pong.js / styles.css
     path("match/join/", join_match, name="join_match"),  # New API endpoint
+    path("lobby/", lobby_status, name="lobby_status"),  # Live feed: ws/lobby/
+    path("tournament/create/", create_tournament, name="create_tournament"),
+    path("tournament/<int:tournament_id>/", tournament_status, name="tournament_status"),
 ]
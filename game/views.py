@@ -1,32 +1,117 @@
-from django.shortcuts import render
-from django.http import JsonResponse
-from game.models import PongGame
+from datetime import timedelta
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.shortcuts import get_object_or_404
+from django.http import Http404, JsonResponse
+from django.utils import timezone
+from django.views.decorators.http import require_GET, require_POST, require_safe
+from game.consumers import prewarm_games
+from game.models import PongGame, Tournament
+from game import assets, lobby, tournament as brackets
+import json
 import uuid
 
+@require_safe
 def pong_game(request):
-    """Render the Pong game page."""
-    return render(request, "game/index.html")
+    """Serve the Pong game page from memory; browsers revalidate it by ETag."""
+    return assets.serve(request, assets.lobby_page(), assets.REVALIDATE)
+
+@require_safe
+def client_asset(request, filename):
+    """Serve pong.js / styles.css under their content-hashed names, cached for a year."""
+    asset = assets.get_asset(filename)
+    if asset is None:
+        raise Http404(f"Unknown or outdated asset: {filename}")
+    return assets.serve(request, asset, assets.IMMUTABLE)
 
 def join_match(request):
-    """Assigns player to an available match or creates a new one."""
+    """Points the player at a game waiting for an opponent, or creates a new one.
+
+    Seats are taken by GameConsumer when the player's socket connects, so a
+    game nobody else joins stays pending and can be filled by the bot.
+    """
     
-    # ✅ Look for an existing game that is still pending and has only one player
-    open_game = PongGame.objects.filter(status="pending", player2_id__isnull=True).first()
+    # ✅ Look for a pending game whose first player is already connected
+    open_games = PongGame.objects.filter(
+        status="pending", player1_id__isnull=False, player2_id__isnull=True
+    )
+    if settings.BOT_ENABLED:
+        # The bot timer starts when player1 connects, just after the game is created;
+        # don't hand out a seat the bot may take before this player's socket connects
+        bot_due = timezone.now() - timedelta(seconds=settings.BOT_FILL_DELAY - settings.BOT_JOIN_MARGIN)
+        open_games = open_games.filter(created_at__gt=bot_due)
+    open_game = open_games.order_by("created_at").first()
 
     if open_game:
-        open_game.player2_id = str(uuid.uuid4())  # Assign a new unique player ID
-        open_game.status = "in_progress"  # ✅ Start the game when the second player joins
-        open_game.save()
-        print(f"✅ [join_match] Assigned Player 2 to game: {open_game.game_key}")
+        print(f"✅ [join_match] Matched player with game: {open_game.game_key}")
         return JsonResponse({"game_key": str(open_game.game_key)})
 
     # ✅ If no open game exists, create a new one
     new_game = PongGame.objects.create(
-        player1_id=str(uuid.uuid4()), 
         game_key=uuid.uuid4(), 
         status="pending"  # 🔥 ENSURE it's pending
     )
     print(f"✅ [join_match] Created new game: {new_game.game_key}, Status: {new_game.status}")
+    async_to_sync(lobby.broadcast)(lobby.track(new_game))
     
     return JsonResponse({"game_key": str(new_game.game_key)})
-    
\ No newline at end of file
+
+
+@require_POST
+def create_tournament(request):
+    """Creates a bracket from a list of player ids and pre-warms its first-round games (staff only).
+
+    The response includes each player's seat token; hand each player only their own.
+    """
+    user = getattr(request, "user", None)  # Game workers run without auth middleware
+    if user is None or not user.is_staff:
+        return JsonResponse({"status": "error", "message": "Staff only"}, status=403)
+
+    try:
+        data = json.loads(request.body)
+        player_ids = [uuid.UUID(str(player_id)) for player_id in data["player_ids"]]
+        tournament, games = brackets.create_tournament(data.get("name", "Tournament"), player_ids)
+    except (ValueError, KeyError, TypeError) as e:
+        return JsonResponse({"status": "error", "message": str(e)}, status=400)
+
+    prewarm_games(games)
+    async_to_sync(lobby.broadcast)(*(lobby.track(game) for game in games))
+    print(f"✅ [create_tournament] Created tournament {tournament.id} with {len(games)} games")
+    seat_tokens = {str(player_id): brackets.seat_token(player_id) for player_id in player_ids}
+    return _tournament_response(tournament, seat_tokens=seat_tokens)
+
+
+@require_GET
+def tournament_status(request, tournament_id):
+    """Returns the bracket with every match's players, game key and winner (no seat tokens)."""
+    return _tournament_response(get_object_or_404(Tournament, id=tournament_id))
+
+
+def _tournament_response(tournament, **extra):
+    matches = tournament.matches.select_related("game")
+    return JsonResponse({
+        **extra,
+        "id": tournament.id,
+        "name": tournament.name,
+        "status": tournament.status,
+        "winner": tournament.winner,
+        "matches": [
+            {
+                "round": match.round,
+                "slot": match.slot,
+                "player1_id": match.player1_id,
+                "player2_id": match.player2_id,
+                "game_key": match.game.game_key if match.game else None,
+                "starts_at": match.starts_at,
+                "winner": match.winner,
+            }
+            for match in matches
+        ],
+    })
+
+
+@require_GET
+def lobby_status(request):
+    """Lists pending and in-progress games with player/spectator counts, from memory."""
+    lobby.load()
+    return JsonResponse(lobby.snapshot())
@@ -0,0 +1,50 @@
+"""
+Lean ASGI config for game workers.
+
+Loads ``pong_backend.settings_game`` (no admin/auth/sessions/staticfiles),
+builds the URL resolvers and physics constants up front, and reports how
+long the boot took, so new workers are ready before their first connection.
+
+    daphne pong_backend.asgi_game:application
+"""
+
+import logging
+import os
+import time
+
+_boot_started = time.perf_counter()
+
+import django
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'pong_backend.settings_game')
+django.setup()
+_setup_done = time.perf_counter()
+
+from django.core.asgi import get_asgi_application
+from django.urls import Resolver404, get_resolver, reverse
+from channels.routing import ProtocolTypeRouter, URLRouter
+from game.logic import warm_up
+from game.routing import websocket_urlpatterns
+
+application = ProtocolTypeRouter({
+    "http": get_asgi_application(),
+    "websocket": URLRouter(websocket_urlpatterns),
+})
+
+logger = logging.getLogger(__name__)
+
+# Compile the HTTP routes (resolve and reverse tables) now instead of on the first request
+try:
+    get_resolver().resolve("/pong/")
+    reverse("client_asset", args=["pong.js"])
+except Resolver404:
+    pass
+warm_up()
+
+_boot_done = time.perf_counter()
+logger.info(
+    "Game worker ready in %.0fms (django.setup %.0fms, imports + warm-up %.0fms)",
+    (_boot_done - _boot_started) * 1000,
+    (_setup_done - _boot_started) * 1000,
+    (_boot_done - _setup_done) * 1000,
+)
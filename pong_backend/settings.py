@@ -53,11 +53,45 @@ CHANNEL_LAYERS = {
 }
 
 # Database
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / "db.sqlite3",
+# PONG_DB_PROFILE=sqlite (default) is tuned for a single node; PONG_DB_PROFILE=postgres
+# shares one database between nodes and keeps each worker thread's connection open
+# between requests (CONN_MAX_AGE). That is persistent connections, not a pool: with
+# many workers, point POSTGRES_HOST/PORT at PgBouncer in transaction mode to pool them.
+DB_PROFILE = os.environ.get("PONG_DB_PROFILE", "sqlite")
+
+if DB_PROFILE == "postgres":
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.environ.get("POSTGRES_DB", "pong"),
+            'USER': os.environ.get("POSTGRES_USER", "pong"),
+            'PASSWORD': os.environ.get("POSTGRES_PASSWORD", ""),
+            'HOST': os.environ.get("POSTGRES_HOST", "localhost"),
+            'PORT': os.environ.get("POSTGRES_PORT", "5432"),
+            'CONN_MAX_AGE': int(os.environ.get("POSTGRES_CONN_MAX_AGE", "60")),  # Persistent connections
+            'CONN_HEALTH_CHECKS': True,  # Re-check a reused connection before handing it out
+            'OPTIONS': {
+                'connect_timeout': 5,
+            },
+        }
     }
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.environ.get("SQLITE_PATH", BASE_DIR / "db.sqlite3"),
+        }
+    }
+
+# Applied to every SQLite connection by game.db.configure_sqlite. WAL lets readers
+# run alongside the single writer; synchronous=NORMAL is durable across app crashes.
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "busy_timeout": 20000,  # ms to wait for the writer lock instead of "database is locked"
+    "cache_size": -16000,  # KiB
+    "temp_store": "MEMORY",
+    "mmap_size": 64 * 1024 * 1024,
 }
 
 
@@ -134,7 +168,26 @@ STATICFILES_DIRS = [
     os.path.join(BASE_DIR, "game/static"),  # ✅ Correctly reference the "static" folder inside "game"
 ]
 
+# The lobby page and client bundle are served from memory by game.assets under
+# content-hashed URLs; in DEBUG they are re-read on every request.
+CLIENT_ASSETS_RELOAD = DEBUG
+
+
+
+# Match replays: per-tick inputs and seeds, re-playable through game.logic
+REPLAY_ENABLED = True
+REPLAY_DIR = BASE_DIR / "replays"
+REPLAY_BUFFER_SIZE = 64 * 1024
+
+# Server-side bot that takes player2 when nobody joins within BOT_FILL_DELAY seconds
+BOT_ENABLED = True
+BOT_FILL_DELAY = 10
+BOT_JOIN_MARGIN = 2  # join_match skips games whose bot is due within this many seconds
 
+# Tournament first-round games start in batches of this size, this many seconds apart
+TOURNAMENT_STAGGER_BATCH = 16
+TOURNAMENT_STAGGER_INTERVAL = 0.5
+TOURNAMENT_MAX_PLAYERS = 256  # Caps the rows one create request can bulk-insert
 
 
 # Default primary key field type
@@ -0,0 +1,54 @@
+"""
+Lean settings for game workers.
+
+Game workers serve the websocket game and the small JSON API in game.urls.
+They skip admin, auth, sessions, messages and staticfiles so a fresh worker
+boots faster; run the full ``pong_backend.settings`` for admin, static files
+and the staff-only tournament creation endpoint.
+"""
+from pong_backend.settings import *  # noqa: F401,F403
+
+INSTALLED_APPS = [
+    'channels',
+    'game',
+    'corsheaders',
+]
+
+MIDDLEWARE = [
+    'corsheaders.middleware.CorsMiddleware',
+    'django.middleware.security.SecurityMiddleware',
+    'django.middleware.common.CommonMiddleware',
+    'django.middleware.csrf.CsrfViewMiddleware',
+]
+
+ROOT_URLCONF = 'game.urls'
+
+TEMPLATES = [
+    {
+        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'DIRS': [],
+        'APP_DIRS': True,
+        'OPTIONS': {
+            'context_processors': [
+                'django.template.context_processors.debug',
+                'django.template.context_processors.request',
+            ],
+        },
+    },
+]
+
+AUTH_PASSWORD_VALIDATORS = []
+
+ASGI_APPLICATION = "pong_backend.asgi_game.application"
+
+# Boot timing from pong_backend.asgi_game; raise the level to silence it
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {
+        "console": {"class": "logging.StreamHandler"},
+    },
+    "loggers": {
+        "pong_backend.asgi_game": {"handlers": ["console"], "level": "INFO"},
+    },
+}